@@ -1,125 +1,167 @@
 import os
+import sys
 import re
+import json
+import atexit
+import argparse
 import base64
+import contextlib
+import functools
+import queue
 import shutil
+import stat
+import struct
+import subprocess
+import threading
 import urllib3
 from pathlib import Path
 from urllib.parse import unquote
 
-from html.parser import HTMLParser
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from subprocess import Popen, PIPE
+from typing import List, Optional, Tuple
 
 full_size = 0
 compressed_size = 0
 
-class _ScriptExtractor(HTMLParser):
-    def __init__(self):
-        super().__init__()
-        self._collect = False
-        self._has_src = False
-        self._buffer: List[str] = []
-        self.scripts: List[str] = []
-
-    def handle_starttag(self, tag, attrs):
-        if tag.lower() == "script":
-            attrs_dict = {name.lower(): val for name, val in attrs}
-            if "src" in attrs_dict:
-                self._has_src = True
-                self._collect = False
-            else:
-                self._has_src = False
-                self._collect = True
-                self._buffer = []
-
-    def handle_endtag(self, tag):
-        if tag.lower() == "script":
-            if self._collect and not self._has_src:
-                content = "".join(self._buffer)
-                self.scripts.append(content)
-            self._collect = False
-            self._has_src = False
-            self._buffer = []
-
-    def handle_data(self, data):
-        if self._collect and not self._has_src:
-            self._buffer.append(data)
-
-    def handle_comment(self, data):
-        if self._collect and not self._has_src:
-            # keep comments inside script if present
-            self._buffer.append(f"<!--{data}-->")
-
-    def handle_entityref(self, name):
-        if self._collect and not self._has_src:
-            self._buffer.append(f"&{name};")
-
-    def handle_charref(self, name):
-        if self._collect and not self._has_src:
-            self._buffer.append(f"&#{name};")
-
-def embed_favicon(html: str, base_path: str = ".") -> str:
+# Equivalent of `terser -c` (compress, no mangling)
+TERSER_OPTIONS = {"compress": {}, "mangle": False}
+TERSER_WORKER_JS = Path(__file__).resolve().parent / "terser_worker.js"
+
+FONT_MIME_TYPES = {
+    'woff2': 'font/woff2',
+    'woff': 'font/woff',
+    'ttf': 'font/ttf',
+    'otf': 'font/otf',
+    'eot': 'application/vnd.ms-fontobject',
+    'svg': 'image/svg+xml',
+}
+
+SCRIPT_SRC_RE = re.compile(rb'^[ \t]*<script\s+src="([^"]+)"\s*>\s*</script\s*>[ \t]*(?=\r?$)', re.MULTILINE)
+STYLESHEET_LINK_RE = re.compile(rb'<link\s+rel="stylesheet"\s+href="([^"]+)"')
+CSS_URL_RE = re.compile(rb"url\(([^)]+)\)")
+ICO_HREF_RE = re.compile(rb'href="([^"]+\.ico)"', re.IGNORECASE)
+SCRIPT_BLOCK_RE = re.compile(rb'<!--.*?-->|<script\b([^>]*)>(.*?)</script\s*>', re.IGNORECASE | re.DOTALL)
+SRC_ATTR_RE = re.compile(rb'(?<![\w-])src\s*=', re.IGNORECASE)
+EXTRA_FAVICON_RE = re.compile(rb'\s*<link\s+rel="(?:icon"\s+type="image/png|apple-touch-icon)', re.IGNORECASE)
+
+_terser_available: Optional[bool] = None
+# Idle Terser workers, shared by every thread pool so node processes are reused
+_idle_terser_workers: "queue.Queue[_TerserWorker]" = queue.Queue()
+_stats_lock = threading.Lock()
+
+def extract_scripts(html: bytes) -> List[Tuple[int, int, bytes]]:
+    """
+    Finds the inline (non-src) <script> blocks in the HTML.
+
+    :param html: The HTML document.
+    :return: A (start, end, body) tuple for each script body, in document order.
+    """
+    scripts = []
+    for m in SCRIPT_BLOCK_RE.finditer(html):
+        # group 2 is None for comments, which are matched only so scripts inside them are skipped
+        if m.group(2) is not None and not SRC_ATTR_RE.search(m.group(1)):
+            scripts.append((m.start(2), m.end(2), m.group(2)))
+    return scripts
+
+def splice(data: bytes, replacements: List[Tuple[int, int, bytes]]) -> bytes:
+    """
+    Replaces the given (start, end) ranges of data in a single left-to-right pass.
+
+    :param data: The original bytes.
+    :param replacements: (start, end, new_bytes) tuples, sorted and non-overlapping.
+    :return: The spliced result.
+    """
+    # memoryview slices don't copy, so the join below is the only copy of the unchanged parts
+    view = memoryview(data)
+    out = []
+    cursor = 0
+    for start, end, new in replacements:
+        out.append(view[cursor:start])
+        out.append(new)
+        cursor = end
+    out.append(view[cursor:])
+    return b''.join(out)
+
+def embed_favicon(html: bytes, base_path: str = ".") -> bytes:
     """
     Replaces the .ico favicon link in the HTML with a Base64 data URI.
     
-    :param html: The HTML string containing <link> tags.
+    :param html: The HTML document containing <link> tags.
     :param base_path: Base path to resolve relative favicon file paths.
     :return: Updated HTML with embedded Base64 favicon.
     """
-    # Regex to find the first .ico href in a <link> tag
-    ico_pattern = re.compile(r'href="([^"]+\.ico)"', re.IGNORECASE)
-    match = ico_pattern.search(html)
-    print (f"[+] Searching for favicon.ico in HTML: {match.group(1) if match else 'not found'}")
+    # Find the first .ico href in a <link> tag
+    match = ICO_HREF_RE.search(html)
+    print (f"[+] Searching for favicon.ico in HTML: {match.group(1).decode('utf-8') if match else 'not found'}")
     if not match:
         raise ValueError("No .ico file found in HTML.")
     
-    ico_path = Path(base_path) / match.group(1)
+    ico_path = Path(base_path) / match.group(1).decode('utf-8')
     
     if not ico_path.exists():
         raise FileNotFoundError(f"Favicon file not found: {ico_path}")
     
     # Read and encode
     with open(ico_path, "rb") as f:
-        b64_data = base64.b64encode(f.read()).decode("ascii")
+        b64_data = base64.b64encode(f.read())
     
     # Replace href value with data URI
-    data_uri = f'data:image/x-icon;base64,{b64_data}'
-    updated_html = ico_pattern.sub(f'href="{data_uri}"', html)
+    data_uri = b'data:image/x-icon;base64,' + b64_data
+    updated_html = ICO_HREF_RE.sub(b'href="' + data_uri + b'"', html)
     
     return updated_html
 
-def remove_other_favicons(html: str) -> str:
+def remove_other_favicons(html: bytes) -> bytes:
     """
     Removes all favicon links except the one with .ico extension.
     
-    :param html: The HTML string containing <link> tags.
+    :param html: The HTML document containing <link> tags.
     :return: Updated HTML with only the .ico favicon link.
     """
-    lns = html.split('\n')
-    pattern = re.compile(r'\s*<link\s+rel="(?:icon"\s+type="image/png|apple-touch-icon)', flags=re.IGNORECASE)
-    lns = [ln for ln in lns if not pattern.search(ln)]
-    return '\n'.join(lns)
+    lns = html.split(b'\n')
+    lns = [ln for ln in lns if not EXTRA_FAVICON_RE.search(ln)]
+    return b'\n'.join(lns)
     
 
-def final_pass_check(filename):
-    if exists("html-minifier-next"):
+def final_pass_check(html: bytes, output_filename: str = 'standalone.min.html') -> bool:
+    """
+    Minifies the page with html-minifier-next, if it is installed.
+
+    :param html: The standalone HTML document.
+    :param output_filename: Where to write the minified page.
+    :return: True if the minified page was written.
+    """
+    html_min_bin = find_local("html-minifier-next")
+    if html_min_bin is not None:
         print("[+] Running final pass with html-minifier-next...", flush=True, end="")
-        output_filename = filename.replace('.html', '.min.html')
-        os.system(f"npx html-minifier-next --collapse-whitespace --remove-comments --minify-css true --minify-js true {filename} -o {output_filename}")
-        before_size = os.path.getsize(filename)
+        # Feed the page over stdin rather than having html-minifier-next re-read it from disk
+        rv = subprocess.run([html_min_bin, '--collapse-whitespace', '--remove-comments', '--minify-css', 'true', '--minify-js', 'true', '-o', output_filename], input=html, check=False).returncode
+        if rv != 0:
+            print(f"failed (exit code {rv})")
+            return False
+        before_size = len(html)
         after_size = os.path.getsize(output_filename)
         print(f"done ({bytes_string(before_size)} -> {bytes_string(after_size)}")
-        
-        
-            
-def embed_fonts_in_css(css_file, output_file):
-    css_path = Path(css_file).resolve()
-    base_dir = css_path.parent
+        return True
+    return False
+
+
+@functools.lru_cache(maxsize=None)
+def _encode_font(font_path: str) -> bytes:
+    with open(font_path, 'rb') as f:
+        return base64.b64encode(f.read())
 
-    with open(css_path, 'r', encoding='utf-8') as f:
-        css = f.read()
+def embed_fonts_in_css(css: bytes, base_dir: Path) -> bytes:
+    """
+    Replaces every local url(...) in the CSS with a Base64 data URI.
 
+    :param css: The CSS source.
+    :param base_dir: Directory used to resolve relative font paths.
+    :return: The CSS with fonts embedded.
+    """
     def replace_font_url(match):
-        url = match.group(1).strip('\'"')
+        url = match.group(1).strip(b'\'"').decode('utf-8')
         if "?" in url:
             url = url.split('?')[0]
         if url.startswith('data:'):
@@ -132,29 +174,13 @@ def embed_fonts_in_css(css_file, output_file):
             return match.group(0)
 
         ext = font_path.suffix.lower().lstrip('.')
-        mime = {
-            'woff2': 'font/woff2',
-            'woff': 'font/woff',
-            'ttf': 'font/ttf',
-            'otf': 'font/otf',
-            'eot': 'application/vnd.ms-fontobject',
-            'svg': 'image/svg+xml',
-        }.get(ext, 'application/octet-stream')
+        mime = FONT_MIME_TYPES.get(ext, 'application/octet-stream')
         print (f"\t[+] Embedding font: {os.path.basename(font_path)} ({mime})")
 
-        with open(font_path, 'rb') as f:
-            encoded = base64.b64encode(f.read()).decode('utf-8')
-
-        data_url = f"data:{mime};base64,{encoded}"
-        return f"url('{data_url}')"
+        return b"url('data:" + mime.encode('ascii') + b";base64," + _encode_font(str(font_path)) + b"')"
 
     # Replace all font-face url(...) instances
-    css_out = re.sub(r"url\(([^)]+)\)", replace_font_url, css)
-
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write(css_out)
-
-    print(f"[+] Embedded fonts written to: {os.path.basename(output_file)}")
+    return CSS_URL_RE.sub(replace_font_url, css)
 
 def humanize_bytes(n: int) -> str:
     for unit in ("B", "kB", "MB", "GB", "TB", "PB", "EB"):
@@ -170,162 +196,291 @@ def humanize_bytes(n: int) -> str:
 def bytes_string(n: int) -> str:
     return f"{n} bytes ({humanize_bytes(n)})"
 
-def exists(bin_name: str) -> bool:
-    # First, check the PATH
-    if shutil.which(bin_name) is not None:
-        return True
-
-    # Also check common local Node.js bin folders (project-local installs)
+@functools.lru_cache(maxsize=None)
+def _candidate_bin_dirs() -> Tuple[Path, ...]:
+    # Common local Node.js bin folders (project-local installs)
     # Search upwards from both CWD and this script's directory
-    start_points = {Path.cwd().resolve(), Path(__file__).resolve().parent}
-    candidate_dirs = set()
+    start_points = dict.fromkeys([Path.cwd().resolve(), Path(__file__).resolve().parent])
+    candidate_dirs = {}
     for start in start_points:
         for p in [start, *start.parents]:
             for nm in ("node_modules", "node_libraries"):
-                candidate_dirs.add(p / nm / ".bin")
+                candidate_dirs[p / nm / ".bin"] = None
+    return tuple(d for d in candidate_dirs if d.is_dir())
+
+def _is_executable(path: Path) -> bool:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    return stat.S_ISREG(st.st_mode) and bool(st.st_mode & 0o111)
+
+@functools.lru_cache(maxsize=None)
+def find_local(bin_name: str) -> Optional[str]:
+    """Returns the path to an executable on PATH or in a project-local node_modules/.bin, or None."""
+    # First, check the PATH
+    path = shutil.which(bin_name)
+    if path is not None:
+        return path
 
     # Build candidate executable names (Windows extensions if needed)
-    candidates = {bin_name}
+    candidates = [bin_name]
     if os.name == 'nt' and not any(bin_name.lower().endswith(ext) for ext in ('.cmd', '.exe', '.bat')):
-        for ext in ('.cmd', '.exe', '.bat'):
-            candidates.add(bin_name + ext)
+        candidates += [bin_name + ext for ext in ('.cmd', '.exe', '.bat')]
 
-    for d in candidate_dirs:
-        if d.is_dir():
-            for name in candidates:
-                exe_path = d / name
-                if exe_path.exists() and os.access(exe_path, os.X_OK):
-                    return True
+    for d in _candidate_bin_dirs():
+        for name in candidates:
+            exe_path = d / name
+            if _is_executable(exe_path):
+                return str(exe_path)
 
-    return False
+    return None
+
+def exists(bin_name: str) -> bool:
+    return find_local(bin_name) is not None
+
+def _terser_module_resolves() -> bool:
+    # The worker does require('terser'), which only resolves relative to terser_worker.js,
+    # so a terser binary on PATH (e.g. a global install) isn't enough
+    node = shutil.which('node')
+    if node is None:
+        return False
+    rv = subprocess.run([node, '-e', "require.resolve('terser')"], cwd=TERSER_WORKER_JS.parent,
+                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False).returncode
+    return rv == 0
 
 def check_terser_exists():
-    return exists('terser')
+    global _terser_available
+    if _terser_available is None:
+        _terser_available = _terser_module_resolves()
+        if not _terser_available and exists('terser'):
+            print(f"[!] terser was found but cannot be loaded from {TERSER_WORKER_JS.parent}, scripts will not be compressed.")
+            print(f"[!] Run `npm install terser` in {TERSER_WORKER_JS.parent} to fix this.")
+    return _terser_available
+
+class _TerserWorker:
+    """
+    Single long-lived node process running terser_worker.js, so each script
+    costs one round trip over a pipe instead of a node (and npx) startup.
+    """
+    def __init__(self):
+        self._proc = Popen([shutil.which('node'), str(TERSER_WORKER_JS)], stdin=PIPE, stdout=PIPE)
+        self._next_id = 0
+
+    def _send_frame(self, header: dict, code: bytes):
+        payload = json.dumps(header).encode('utf-8')
+        self._proc.stdin.write(struct.pack('>I', len(payload)) + payload + struct.pack('>I', len(code)))
+        self._proc.stdin.write(code)
+        self._proc.stdin.flush()
+
+    def _read_exactly(self, n: int) -> bytes:
+        data = self._proc.stdout.read(n)
+        if len(data) != n:
+            raise RuntimeError("terser worker exited unexpectedly")
+        return data
+
+    def _read_frame(self) -> Tuple[dict, bytes]:
+        (length,) = struct.unpack('>I', self._read_exactly(4))
+        header = json.loads(self._read_exactly(length).decode('utf-8'))
+        (length,) = struct.unpack('>I', self._read_exactly(4))
+        return header, self._read_exactly(length)
+
+    def minify(self, code: bytes) -> bytes:
+        self._next_id += 1
+        self._send_frame({"id": self._next_id, "options": TERSER_OPTIONS}, code)
+        header, compressed = self._read_frame()
+        if header.get("error"):
+            raise RuntimeError(header["error"])
+        return compressed
+
+    def alive(self) -> bool:
+        return self._proc.poll() is None
+
+    def close(self):
+        if self._proc.poll() is None:
+            self._proc.stdin.close()
+            self._proc.wait()
+
+@contextlib.contextmanager
+def terser_worker():
+    """Checks out an idle Terser worker (starting one if none is free) for the duration of the block."""
+    try:
+        worker = _idle_terser_workers.get_nowait()
+    except queue.Empty:
+        worker = _TerserWorker()
+        atexit.register(worker.close)
+    try:
+        yield worker
+    finally:
+        # a worker that died mid-request is dropped rather than handed out again
+        if worker.alive():
+            _idle_terser_workers.put(worker)
+
+def looks_minified(script: bytes) -> bool:
+    """Cheap heuristic for scripts that are already minified (very little whitespace, or very long lines)."""
+    n = len(script)
+    if n < 512:
+        return False
+    whitespace = sum(map(script.count, (b' ', b'\t', b'\n')))
+    return whitespace / n < 0.05 or script.count(b'\n') < n / 200
 
 def compress_file(filename):
     global full_size, compressed_size
+    if filename.endswith('.min.js'):
+        return filename
     if not check_terser_exists():
         print("Terser is not installed. Please install it to compress files.")
         return False
     output_filename = filename.replace('.js', '.min.js')
-    rv = os.system(f"npx terser -c -o {output_filename} {filename}")
-    if rv == 0:
-        ofs = os.path.getsize(output_filename)
-        ifs = os.path.getsize(filename)
+    with open(filename, 'rb') as f:
+        script = f.read()
+    try:
+        with terser_worker() as worker:
+            compressed_script = worker.minify(script)
+    except (OSError, RuntimeError) as e:
+        print(f"Failed to compress {filename}: {e}")
+        return False
+    with open(output_filename, 'wb') as f:
+        f.write(compressed_script)
+    ofs = os.path.getsize(output_filename)
+    ifs = os.path.getsize(filename)
+    with _stats_lock:
         full_size += ifs
         compressed_size += ofs
-        print(f"[-] Compressed {filename} {bytes_string(ifs)} to {output_filename} {bytes_string(ofs)}")
-        return output_filename
-    else:
-        print(f"Failed to compress {filename}")
-        return False
+    print(f"[-] Compressed {filename} {bytes_string(ifs)} to {output_filename} {bytes_string(ofs)}")
+    return output_filename
 
-def compress_js(script: str) -> str:
+def compress_js(script: bytes) -> bytes:
     if not check_terser_exists():
         print("Terser is not installed. Please install it to compress files.")
         return script
-    from subprocess import Popen, PIPE
-    # Using shell=True with a list causes the shell to interpret stdin (the JS) as shell script.
-    # Run npx directly with arguments and no shell so terser reads from stdin.
-    proc = Popen(['npx', '--yes', 'terser', '-c'], stdin=PIPE, stdout=PIPE, stderr=PIPE, shell=False)
-    stdout, stderr = proc.communicate(script.encode('utf-8'))
-    if proc.returncode != 0:
-        print(f"Terser error: {stderr.decode('utf-8')}")
+    try:
+        with terser_worker() as worker:
+            return worker.minify(script)
+    except (OSError, RuntimeError) as e:
+        print(f"Terser error: {e}")
         return script
-    compressed_script = stdout.decode('utf-8')
-    return compressed_script
 
-def compress_inline_js(html_content: str) -> str:  
+def compress_inline_js(html_content: bytes) -> bytes:
     global full_size, compressed_size
-    parser = _ScriptExtractor()
-    parser.feed(html_content)
-    ar = list(parser.scripts)
-    for i, script in enumerate(ar):
-        compressed_script = compress_js(script)
+    scripts = extract_scripts(html_content)
+    spans = [(start, end) for start, end, _ in scripts]
+    ar = [script for _, _, script in scripts]
+    # Minify each distinct script body once, however many times it appears
+    unique = list(dict.fromkeys(ar))
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        results = dict(zip(unique, pool.map(lambda script: script if looks_minified(script) else compress_js(script), unique)))
+    compressed = [results[script] for script in ar]
+    replacements = []
+    for i, ((start, end), script, compressed_script) in enumerate(zip(spans, ar, compressed)):
         if compressed_script != script:
             full_size += len(script)
             compressed_size += len(compressed_script)
             print (f"Compressed inline script {i+1} from {bytes_string(len(script))} to {bytes_string(len(compressed_script))}")
-            html_content = html_content.replace(script, compressed_script)
-    return html_content
+            replacements.append((start, end, compressed_script))
+    return splice(html_content, replacements)
+
+@functools.lru_cache(maxsize=None)
+def _stylesheet_tag_re(css_file: bytes) -> re.Pattern:
+    return re.compile(rb'<link.*rel="stylesheet".*href="' + re.escape(css_file) + rb'".*>', re.IGNORECASE)
 
-def inline_css(html_content: str) -> str:
-    css_files = re.findall(r'<link\s+rel="stylesheet"\s+href="([^"]+)"', html_content)
-    for css_file in css_files:
+def inline_css(html_content: bytes) -> bytes:
+    for css_href in STYLESHEET_LINK_RE.findall(html_content):
+        css_file = css_href.decode('utf-8')
         if not css_file.startswith('http://') and not css_file.startswith('https://'):
             #print (f"Processing local CSS file: {css_file}")
             css_path = Path(css_file).resolve()
             if css_path.exists():
-                with open(css_path, 'r', encoding='utf-8') as f:
+                with open(css_path, 'rb') as f:
                     css_content = f.read()
-                if re.search(r"url\(([^)]+)\)", css_content):
-                    print(f"[+] Embedding fonts in CSS file: {css_file}")
-                    new_css_file = os.path.basename(css_file.replace('.css', '.min.css'))
-                    embed_fonts_in_css(css_path, css_path.with_name(new_css_file))
-                    css_content = open(css_path.with_name(new_css_file), 'r', encoding='utf-8').read()
-                style_tag = f"<style>\n/* Content from {css_file} */\n {css_content}\n</style>"
+                css_content = embed_fonts_in_css(css_content, css_path.parent)
+                style_tag = b"<style>\n/* Content from " + css_href + b" */\n " + css_content + b"\n</style>"
                 html_before = len(html_content)
                 #html_content = html_content.replace(f'<link rel="stylesheet" href="{css_file}">', style_tag)
-                replace_reg = rf'<link.*rel="stylesheet".*href="{css_file}".*>'
-                html_content = re.sub(replace_reg, lambda _: style_tag, html_content, flags=re.IGNORECASE)
+                html_content = _stylesheet_tag_re(css_href).sub(lambda _: style_tag, html_content)
                 html_after = len(html_content)
                 print (f"[+] Replaced {css_file} with inline style tag, size changed from {bytes_string(html_before)} to {bytes_string(html_after)}")
             else:
                 print(f"CSS file not found: {css_file}")
     return html_content
 
-def main():
+def write_standalone_html(html: bytes, filename: str = 'standalone.html'):
+    with open(filename, 'wb', buffering=1 << 20) as f:
+        f.write(html)
+    print (f"Standalone HTML file created as {filename} {bytes_string(len(html))}")
+
+def main(write_standalone: bool = True) -> bytes:
     global full_size, compressed_size
-    txt = open('index.html', 'r', encoding='utf-8').read()
+    with open('index.html', 'rb') as f:
+        txt = f.read()
     txt = embed_favicon(txt, base_path='.')
     txt = remove_other_favicons(txt)
     txt = compress_inline_js(txt)
     txt = inline_css(txt)
-    lns = txt.split('\n')
-    with open('standalone.html', 'w', encoding='utf-8') as f:
-        for ln in lns:
-            m = re.match(r'\s*<script\s+src="(.*)"\s*>\s*</script>', ln)
-            if m:
-                external_file = m.group(1)
-                if external_file.startswith('http://') or external_file.startswith('https://'):
-                    resp = urllib3.request("GET", external_file)
-                    if resp.status == 200:
-                        data = resp.data.decode('utf-8')
-                        print(f"[+] Adding external script: {external_file} {bytes_string(len(data))}")
-                        f.write("<script>\n")
-                        f.write("// Fetched from: " + external_file + "\n")
-                        f.write(data)
-                        f.write("\n</script>\n")
-                    else:
-                        print (f"Failed to fetch {external_file}: {resp.status}")
-                        break
-                else:
-                    if not external_file.endswith('.min.js'):
-                        compressed_filename = compress_file(external_file)
-                        if compressed_filename:
-                            external_file = compressed_filename
-                    data = open(external_file).read()
-                    print(f"[+] Adding local script: {external_file} {bytes_string(len(data))}")
-                    f.write("<script>\n")
-                    f.write("// Read from: " + external_file + "\n")
-                    f.write(data)
-                    f.write("\n</script>\n")
+    matches = list(SCRIPT_SRC_RE.finditer(txt))
+    srcs = [m.group(1).decode('utf-8') for m in matches]
+    # Fetch remote scripts and compress local ones up front, in parallel
+    remote_srcs = [src for src in srcs if src.startswith(('http://', 'https://'))]
+    local_srcs = [src for src in srcs if src not in remote_srcs and not src.endswith('.min.js')]
+    http = urllib3.PoolManager(maxsize=16)
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        fetches = {url: pool.submit(http.request, "GET", url) for url in remote_srcs}
+        compressed_files = dict(zip(local_srcs, pool.map(compress_file, local_srcs)))
+    view = memoryview(txt)
+    chunks = []
+    cursor = 0
+    for m in matches:
+        chunks.append(view[cursor:m.start()])
+        cursor = m.end()
+        external_file = m.group(1).decode('utf-8')
+        if external_file.startswith('http://') or external_file.startswith('https://'):
+            resp = fetches[external_file].result()
+            if resp.status == 200:
+                data = resp.data
+                print(f"[+] Adding external script: {external_file} {bytes_string(len(data))}")
+                chunks.extend([b"<script>\n// Fetched from: ", external_file.encode('utf-8'), b"\n", data, b"\n</script>"])
             else:
-                f.write(ln + '\n')
+                print (f"Failed to fetch {external_file}: {resp.status}")
+                break
+        else:
+            compressed_filename = compressed_files.get(external_file)
+            if compressed_filename:
+                external_file = compressed_filename
+            with open(external_file, 'rb') as f:
+                data = f.read()
+            print(f"[+] Adding local script: {external_file} {bytes_string(len(data))}")
+            chunks.extend([b"<script>\n// Read from: ", external_file.encode('utf-8'), b"\n", data, b"\n</script>"])
+    else:
+        chunks.append(view[cursor:])
+
+    html = b''.join(chunks)
+    if write_standalone:
+        write_standalone_html(html)
+    else:
+        print (f"Standalone HTML built in memory {bytes_string(len(html))}")
+    return html
 
-    file_size = os.path.getsize('standalone.html')
-    print (f"Standalone HTML file created as standalone.html {bytes_string(file_size)}")
-    
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Inline all scripts, styles and fonts from index.html into a single standalone HTML file.")
+    parser.add_argument('--min-only', action='store_true', help="only write standalone.min.html (requires html-minifier-next)")
+    args = parser.parse_args()
     if not check_terser_exists() and not exists('html-minifier-next'):
         print ("="*60)
         print ("WARNING: install terser and html-minifier-next to work properly")
         print ("> npm install terser html-minifier-next")
         print ("You can still run this script and it will create a standalone.html file, but it won't be compressed.")
         print ("="*60)
-    main()
+    have_html_minifier = exists('html-minifier-next')
+    if args.min_only and not have_html_minifier:
+        print("html-minifier-next is not installed, writing standalone.html instead", file=sys.stderr)
+    min_only = args.min_only and have_html_minifier
+    html = main(write_standalone=not min_only)
     diff = (compressed_size/full_size) * 100 if full_size > 0 else 0
     print(f"Total size reduction: {compressed_size} bytes ({humanize_bytes(compressed_size)}) from {full_size} bytes ({humanize_bytes(full_size)})")
     print(f"Compression ratio: {diff:.2f}%")
-    final_pass_check('standalone.html')
+    if not final_pass_check(html) and min_only:
+        # Don't leave the user with no output at all
+        print("Minification failed, writing the unminified page instead", file=sys.stderr)
+        write_standalone_html(html)
+        sys.exit(1)
 
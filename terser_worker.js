@@ -0,0 +1,56 @@
+// Long-lived Terser worker used by create_standalone.py.
+// Each request frame is a JSON header ({id, options}) followed by the raw
+// UTF-8 script; each response is a JSON header ({id} or {id, error})
+// followed by the minified script. Both parts are prefixed with their
+// length as a 4 byte big-endian integer.
+const { minify } = require('terser');
+
+let pending = Buffer.alloc(0);
+let queue = Promise.resolve();
+
+function lengthPrefixed(buf) {
+    const header = Buffer.alloc(4);
+    header.writeUInt32BE(buf.length, 0);
+    return [header, buf];
+}
+
+function sendFrame(header, code) {
+    process.stdout.write(Buffer.concat([
+        ...lengthPrefixed(Buffer.from(JSON.stringify(header), 'utf8')),
+        ...lengthPrefixed(code),
+    ]));
+}
+
+async function handleFrame(headerBuf, codeBuf) {
+    let id = null;
+    try {
+        const req = JSON.parse(headerBuf.toString('utf8'));
+        id = req.id;
+        const result = await minify(codeBuf.toString('utf8'), req.options || { compress: {}, mangle: false });
+        sendFrame({ id }, Buffer.from(result.code, 'utf8'));
+    } catch (e) {
+        sendFrame({ id, error: (e && e.message) || String(e) }, Buffer.alloc(0));
+    }
+}
+
+// Returns [headerBuf, codeBuf, rest] once a full frame is buffered, otherwise null
+function takeFrame(buf) {
+    if (buf.length < 4) return null;
+    const headerLen = buf.readUInt32BE(0);
+    if (buf.length < 8 + headerLen) return null;
+    const codeLen = buf.readUInt32BE(4 + headerLen);
+    const end = 8 + headerLen + codeLen;
+    if (buf.length < end) return null;
+    return [buf.subarray(4, 4 + headerLen), buf.subarray(8 + headerLen, end), buf.subarray(end)];
+}
+
+process.stdin.on('data', (chunk) => {
+    pending = Buffer.concat([pending, chunk]);
+    let frame;
+    while ((frame = takeFrame(pending)) !== null) {
+        const [headerBuf, codeBuf] = frame;
+        pending = frame[2];
+        // keep responses in request order
+        queue = queue.then(() => handleFrame(headerBuf, codeBuf));
+    }
+});